@@ -0,0 +1,60 @@
+"""Precompute the AI opening book loaded by main.py.
+
+Walks every position reachable from the initial board within ``--plies``
+half-moves and stores the best move for each AI-to-move position at every
+search depth the API accepts, keyed by Zobrist hash and depth.
+
+    python build_book.py --plies 3 --max-depth 8
+"""
+import argparse
+import json
+from copy import deepcopy
+from typing import Dict
+
+from main import BOOK_FORMAT, BOOK_PATH, GameState, MoveSeq
+
+
+def build_book(plies: int, max_depth: int) -> Dict[int, Dict[int, MoveSeq]]:
+    """Return ``{depth: {hash: move}}`` for every AI-to-move position within ``plies``."""
+    book: Dict[int, Dict[int, MoveSeq]] = {depth: {} for depth in range(1, max_depth + 1)}
+    seen = set()
+    frontier = [GameState()]
+    for _ in range(plies):
+        next_frontier = []
+        for state in frontier:
+            for move in state._all_moves_for_turn():
+                child = deepcopy(state)
+                child.apply_move_sequence_inplace(move)
+                if child.hash not in seen:
+                    seen.add(child.hash)
+                    next_frontier.append(child)
+        frontier = next_frontier
+        for state in frontier:
+            if state.turn == -1:
+                for depth, moves in book.items():
+                    moves[state.hash] = state.best_ai_move(depth)
+    return book
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plies", type=int, default=3, help="half-moves from the start to cover")
+    parser.add_argument("--max-depth", type=int, default=8, help="book every search depth up to this one")
+    parser.add_argument("--out", default=str(BOOK_PATH), help="output JSON path")
+    args = parser.parse_args()
+
+    book = build_book(args.plies, args.max_depth)
+    data = {
+        "format": BOOK_FORMAT,
+        "moves": {
+            str(depth): {str(h): list(move) for h, move in moves.items()}
+            for depth, moves in book.items()
+        },
+    }
+    with open(args.out, "w") as f:
+        json.dump(data, f)
+    print(f"Wrote {len(book[args.max_depth])} positions x {args.max_depth} depths to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from enum import IntEnum
-from copy import deepcopy
-from typing import List, Tuple, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, AsyncIterator, Dict, List, Tuple, Optional
 
-from fastapi import FastAPI, Query
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query
+from pydantic import AfterValidator, BaseModel, Field
 
 
 
@@ -32,11 +43,128 @@ class Piece(IntEnum):
         return abs(self.value) == 2
 
 
-MoveSeq = List[Tuple[int, int]]  
+# Plain int aliases of the Piece values for the move generator and search:
+# hot paths compare raw cell values instead of building Piece members.
+EMPTY = Piece.EMPTY.value
+PLAYER_MAN = Piece.PLAYER_MAN.value
+PLAYER_KING = Piece.PLAYER_KING.value
+AI_MAN = Piece.AI_MAN.value
+AI_KING = Piece.AI_KING.value
+
+# API move: list of (row, col) steps. Internally a move is a tuple of square
+# indices (r * 8 + c), which is cheaper to build, compare and hash.
+ApiMoveSeq = List[Tuple[int, int]]
+MoveSeq = Tuple[int, ...]
+Board = List[int]
+# (overwritten (square, old value) pairs, turn before, hash before)
+UndoRecord = Tuple[List[Tuple[int, int]], int, int]
+
+# Pieces only ever stand on the dark squares, so move generation scans these 32.
+DARK_SQUARES: Tuple[int, ...] = tuple(
+    r * 8 + c for r in range(8) for c in range(8) if (r + c) % 2 == 1
+)
+
+
+# Zobrist keys: one random 64-bit value per (square, piece) and one for "AI to
+# move". XOR-ing the keys of every occupied square gives a position hash that
+# can be updated incrementally as pieces move. Seeded so hashes are stable
+# between runs.
+_zobrist_rng = random.Random(0)
+ZOBRIST: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(_zobrist_rng.getrandbits(64) for _ in range(5)) for _ in range(64)
+)
+ZOBRIST_AI_TURN: int = _zobrist_rng.getrandbits(64)
+
+# Transposition table entry flags.
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+
+def zobrist_hash(board: Board, turn: int) -> int:
+    """Full Zobrist hash of a position; cell values index ZOBRIST by value + 2."""
+    h = ZOBRIST_AI_TURN if turn == -1 else 0
+    for sq, val in enumerate(board):
+        if val:
+            h ^= ZOBRIST[sq][val + 2]
+    return h
+
+
+def board_to_rows(board: Board) -> List[List[int]]:
+    """Reshape the flat 64-cell board into the 8x8 rows used by the API."""
+    return [board[i:i + 8] for i in range(0, 64, 8)]
+
+
+def board_from_rows(rows: List[List[int]]) -> Board:
+    """Flatten 8x8 API rows into the internal 64-cell board."""
+    return [cell for row in rows for cell in row]
+
+
+def move_to_squares(seq: ApiMoveSeq) -> MoveSeq:
+    """Encode an API move of (row, col) steps as square indices."""
+    return tuple(r * 8 + c for r, c in seq)
+
+
+def move_from_squares(move: MoveSeq) -> ApiMoveSeq:
+    """Decode square indices back into the API's (row, col) steps."""
+    return [divmod(sq, 8) for sq in move]
+
+
+def pack_board(board: Board) -> bytes:
+    """Pack the 32 playable cells into 16 bytes, two 4-bit cells per byte.
+
+    Cell values -2..2 are stored as value + 2 (0..4). Used for undo snapshots
+    and for shipping positions to the AI worker processes.
+    """
+    cells = [board[sq] + 2 for sq in DARK_SQUARES]
+    return bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 32, 2))
+
+
+def unpack_board(packed: bytes) -> Board:
+    """Inverse of pack_board."""
+    board = [EMPTY] * 64
+    for i, byte in enumerate(packed):
+        board[DARK_SQUARES[2 * i]] = (byte >> 4) - 2
+        board[DARK_SQUARES[2 * i + 1]] = (byte & 0xF) - 2
+    return board
+
+
+def _check_light_squares_empty(rows: List[List[int]]) -> List[List[int]]:
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            if cell and (r + c) % 2 == 0:
+                raise ValueError(f"piece on light square ({r}, {c})")
+    return rows
+
+
+# Client-supplied board: 8 rows of 8 cells with values -2..2, pieces only on
+# dark squares. Anything else would not survive pack_board or the move tables.
+BoardRows = Annotated[
+    List[Annotated[List[Annotated[int, Field(ge=-2, le=2)]], Field(min_length=8, max_length=8)]],
+    Field(min_length=8, max_length=8),
+    AfterValidator(_check_light_squares_empty),
+]
+
+
+def _check_steps_on_dark_squares(steps: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    for r, c in steps:
+        if (r + c) % 2 == 0:
+            raise ValueError(f"move step on light square ({r}, {c})")
+    return steps
+
+
+# Client-supplied move: at least two (row, col) steps, each on a dark square
+# of the board, so no coordinate aliases onto another square of the flat board
+# and no piece can be left where pack_board would drop it.
+Coord = Annotated[int, Field(ge=0, le=7)]
+MoveSteps = Annotated[
+    List[Tuple[Coord, Coord]],
+    Field(min_length=2),
+    AfterValidator(_check_steps_on_dark_squares),
+]
+
 
 class Move(BaseModel):
-    board: List[List[int]]
-    move: MoveSeq 
+    board: BoardRows
+    move: MoveSteps
 
 
 
@@ -51,122 +179,185 @@ class GameState:
         self.reset()
 
     def reset(self) -> None:
-        self.board: List[List[int]] = self._init_board()
+        self.board: Board = self._init_board()
         self.turn: int = 1  
-        self.history: List[List[List[int]]] = []
+        self.history: List[bytes] = []
+        self.rehash()
+
+    @classmethod
+    def _blank(cls) -> 'GameState':
+        """Instance that skips reset(); the caller assigns board, turn and hash."""
+        obj = cls.__new__(cls)
+        obj.history = []
+        return obj
+
+    def __deepcopy__(self, memo: dict) -> 'GameState':
+        """Cheap clone for search: copies the position but not the undo history."""
+        new = GameState._blank()
+        new.board = self.board[:]
+        new.turn = self.turn
+        new.hash = self.hash
+        return new
+
+    def set_position(self, board: Board, turn: int) -> None:
+        """Replace board and side to move, keeping the Zobrist hash in sync."""
+        self.board = board
+        self.turn = turn
+        self.rehash()
+
+    def rehash(self) -> None:
+        """Recompute the Zobrist hash after board or turn were assigned directly."""
+        self.hash: int = zobrist_hash(self.board, self.turn)
 
     @staticmethod
-    def _init_board() -> List[List[int]]:
-        board = [[Piece.EMPTY.value for _ in range(GameState.BOARD_SIZE)]
-                 for _ in range(GameState.BOARD_SIZE)]
+    def _init_board() -> Board:
+        """Build the starting position as a flat board indexed by ``r * 8 + c``."""
+        size = GameState.BOARD_SIZE
+        board = [Piece.EMPTY.value] * (size * size)
         # Place AI pieces (top)
         for r in range(3):
-            for c in range(GameState.BOARD_SIZE):
+            for c in range(size):
                 if (r + c) % 2 == 1:
-                    board[r][c] = Piece.AI_MAN.value
+                    board[r * size + c] = Piece.AI_MAN.value
         # Place player pieces (bottom)
         for r in range(5, 8):
-            for c in range(GameState.BOARD_SIZE):
+            for c in range(size):
                 if (r + c) % 2 == 1:
-                    board[r][c] = Piece.PLAYER_MAN.value
+                    board[r * size + c] = Piece.PLAYER_MAN.value
         return board
 
-    def _on_board(self, r: int, c: int) -> bool:
-        return 0 <= r < self.BOARD_SIZE and 0 <= c < self.BOARD_SIZE
-
-    def _piece_at(self, r: int, c: int) -> Piece:
-        return Piece(self.board[r][c])
+    @classmethod
+    def _on_board(cls, r: int, c: int) -> bool:
+        return 0 <= r < cls.BOARD_SIZE and 0 <= c < cls.BOARD_SIZE
 
-    def _directions_for(self, piece: Piece) -> List[Tuple[int, int]]:
+    @classmethod
+    def _directions_for(cls, piece: Piece) -> List[Tuple[int, int]]:
         """Returns movement directions allowed for the piece."""
         if piece.is_king:
             return [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        dir_ = self.PLAYER_DIR if piece.is_player else self.AI_DIR
+        dir_ = cls.PLAYER_DIR if piece.is_player else cls.AI_DIR
         return [(dir_, -1), (dir_, 1)]
 
     def get_valid_moves(self, r: int, c: int) -> List[MoveSeq]:
-        piece = self._piece_at(r, c)
-        if piece == Piece.EMPTY or (self.turn == 1 and piece.is_ai) or (self.turn == -1 and piece.is_player):
+        sq = r * self.BOARD_SIZE + c
+        piece = self.board[sq]
+        # Empty cells and the opponent's pieces both fail the sign test.
+        if piece * self.turn <= 0:
             return []
 
-        captures = self._capture_sequences_from(r, c, piece)
+        captures = self._capture_sequences_from(sq, piece)
         if captures:
             return captures  
-        return self._simple_moves_from(r, c, piece)
-
-    def _simple_moves_from(self, r: int, c: int, piece: Piece) -> List[MoveSeq]:
-        moves: List[MoveSeq] = []
-        for dr, dc in self._directions_for(piece):
-            nr, nc = r + dr, c + dc
-            if self._on_board(nr, nc) and self._piece_at(nr, nc) == Piece.EMPTY:
-                moves.append([(r, c), (nr, nc)])
-        return moves
-
-    def _capture_sequences_from(self, r: int, c: int, piece: Piece, visited: Optional[set] = None) -> List[MoveSeq]:
-        if visited is None:
-            visited = set()
+        return self._simple_moves_from(sq, piece)
+
+    def _simple_moves_from(self, sq: int, piece: int) -> List[MoveSeq]:
+        board = self.board
+        return [(sq, to_sq) for to_sq in SIMPLE_TARGETS[sq, piece] if board[to_sq] == EMPTY]
+
+    def _capture_sequences_from(self, sq: int, piece: int) -> List[MoveSeq]:
         sequences: List[MoveSeq] = []
-        for dr, dc in self._directions_for(piece):
-            mid_r, mid_c = r + dr, c + dc
-            end_r, end_c = r + 2 * dr, c + 2 * dc
-            if not (self._on_board(end_r, end_c)):
-                continue
-            mid_piece = self._piece_at(mid_r, mid_c)
-            if mid_piece == Piece.EMPTY or (mid_piece.is_player == piece.is_player):
+        self._extend_captures(sq, piece, [sq], sequences)
+        return sequences
+
+    def _extend_captures(self, sq: int, piece: int, path: List[int], sequences: List[MoveSeq]) -> None:
+        """Depth-first jump search; appends every maximal chain to ``sequences``."""
+        # Jumped pieces are lifted off the board while the chain is explored,
+        # so they can never be captured twice and no visited set is needed.
+        board = self.board
+        for mid_sq, end_sq in JUMP_TARGETS[sq, piece]:
+            mid_value = board[mid_sq]
+            # Only an opponent piece (opposite sign) can be jumped.
+            if mid_value * piece >= 0:
                 continue  
-            if self._piece_at(end_r, end_c) != Piece.EMPTY:
+            if board[end_sq] != EMPTY:
                 continue  
 
-            board_copy = deepcopy(self.board)
-            board_copy[end_r][end_c] = board_copy[r][c]
-            board_copy[r][c] = Piece.EMPTY.value
-            board_copy[mid_r][mid_c] = Piece.EMPTY.value
-
-            nested_state = GameState()
-            nested_state.board = board_copy
-            nested_state.turn = self.turn  
-            further_jumps = nested_state._capture_sequences_from(end_r, end_c, piece, visited | {(r, c)})
-
-            if further_jumps:
-                for seq in further_jumps:
-                    sequences.append([(r, c)] + seq)
-            else:
-                sequences.append([(r, c), (end_r, end_c)])
-        return sequences
+            # Make the jump in place, explore further jumps, then unmake it.
+            board[end_sq] = board[sq]
+            board[sq] = EMPTY
+            board[mid_sq] = EMPTY
+            # ``path`` is shared by the whole search; copy it only at a leaf.
+            path.append(end_sq)
+            found = len(sequences)
+            self._extend_captures(end_sq, piece, path, sequences)
+            if len(sequences) == found:
+                sequences.append(tuple(path))
+            path.pop()
+            board[sq] = board[end_sq]
+            board[mid_sq] = mid_value
+            board[end_sq] = EMPTY
 
     def apply_move_sequence(self, seq: MoveSeq) -> None:
         """Apply a simple move or multi‑jump sequence to the board."""
-        self.history.append(deepcopy(self.board))
+        self.history.append(pack_board(self.board))
+        self.apply_move_sequence_inplace(seq)
+
+    def apply_move_sequence_inplace(self, seq: MoveSeq) -> UndoRecord:
+        """Apply a move without touching history; returns what unapply needs."""
+        size = self.BOARD_SIZE
+        board = self.board
+        h = self.hash
+        overwrites: List[Tuple[int, int]] = []
         for i in range(len(seq) - 1):
-            r1, c1 = seq[i]
-            r2, c2 = seq[i + 1]
-            piece = self._piece_at(r1, c1)
-
-            if abs(r2 - r1) == 2:
-                mid_r, mid_c = (r1 + r2) // 2, (c1 + c2) // 2
-                self.board[mid_r][mid_c] = Piece.EMPTY.value
-
-            self.board[r1][c1] = Piece.EMPTY.value
-            self.board[r2][c2] = piece.value
-
-        final_r, final_c = seq[-1]
-        final_piece = self._piece_at(final_r, final_c)
-        if final_piece.is_man:
-            if final_piece.is_player and final_r == 0:
-                self.board[final_r][final_c] = Piece.PLAYER_KING.value
-            elif final_piece.is_ai and final_r == self.BOARD_SIZE - 1:
-                self.board[final_r][final_c] = Piece.AI_KING.value
-
+            from_sq, to_sq = seq[i], seq[i + 1]
+            piece = board[from_sq]
+
+            # A step changes the index by 7 or 9, a jump by 14 or 18.
+            if abs(to_sq - from_sq) > size + 1:
+                mid_sq = (from_sq + to_sq) // 2
+                captured = board[mid_sq]
+                if captured:
+                    h ^= ZOBRIST[mid_sq][captured + 2]
+                overwrites.append((mid_sq, captured))
+                board[mid_sq] = EMPTY
+
+            # Client moves are not checked for legality, so guard both ends:
+            # EMPTY has no Zobrist key and an overwritten piece must be removed.
+            replaced = board[to_sq]
+            if replaced:
+                h ^= ZOBRIST[to_sq][replaced + 2]
+            if piece:
+                h ^= ZOBRIST[from_sq][piece + 2] ^ ZOBRIST[to_sq][piece + 2]
+            overwrites.append((from_sq, piece))
+            overwrites.append((to_sq, replaced))
+            board[from_sq] = EMPTY
+            board[to_sq] = piece
+
+        final_sq = seq[-1]
+        final_r = final_sq // size
+        final_piece = board[final_sq]
+        king = None
+        if final_piece == PLAYER_MAN and final_r == 0:
+            king = PLAYER_KING
+        elif final_piece == AI_MAN and final_r == size - 1:
+            king = AI_KING
+        if king is not None:
+            h ^= ZOBRIST[final_sq][final_piece + 2] ^ ZOBRIST[final_sq][king + 2]
+            overwrites.append((final_sq, final_piece))
+            board[final_sq] = king
+
+        record = (overwrites, self.turn, self.hash)
         self.turn *= -1
+        self.hash = h ^ ZOBRIST_AI_TURN
+        return record
+
+    def unapply_move_sequence(self, record: UndoRecord) -> None:
+        """Revert a move made with apply_move_sequence_inplace."""
+        overwrites, self.turn, self.hash = record
+        board = self.board
+        for sq, val in reversed(overwrites):
+            board[sq] = val
 
     def undo(self) -> None:
         if self.history:
-            self.board = self.history.pop()
+            self.board = unpack_board(self.history.pop())
             self.turn *= -1
+            self.rehash()
 
-   def status(self) -> str:
-        player_pieces = sum(cell > 0 for row in self.board for cell in row)
-        ai_pieces = sum(cell < 0 for row in self.board for cell in row)
+    def status(self) -> str:
+        board = self.board
+        player_pieces = board.count(PLAYER_MAN) + board.count(PLAYER_KING)
+        ai_pieces = board.count(AI_MAN) + board.count(AI_KING)
         if player_pieces == 0:
             return "AI wins"
         if ai_pieces == 0:
@@ -176,139 +367,358 @@ class GameState:
     def best_ai_move(self, depth: int = 4) -> MoveSeq:
         """Return the best move sequence for the AI using minimax + alpha‑beta pruning."""
 
-        def evaluate(board: List[List[int]]) -> int:
-            score = 0
-            for row in board:
-                for val in row:
-                    piece = Piece(val)
-                    if piece == Piece.EMPTY:
-                        continue
-                    factor = 1 if piece.is_ai else -1
-                    base = 5 if piece.is_king else 3
-                    score += factor * base
-            return score
-
-        def minimax(state: 'GameState', depth_left: int, alpha: int, beta: int) -> Tuple[int, Optional[MoveSeq]]:
+        def evaluate(board: Board) -> int:
+            # Material count: men are worth 3, kings 5, positive favours the AI.
+            # list.count runs in C, so no Python-level loop over the 64 cells.
+            men = board.count(AI_MAN) - board.count(PLAYER_MAN)
+            kings = board.count(AI_KING) - board.count(PLAYER_KING)
+            return 3 * men + 5 * kings
+
+        # Killer moves: the last move that caused a beta cut-off at each ply.
+        killers: Dict[int, MoveSeq] = {}
+        # Transposition table: position hash -> (depth, value, flag, best move).
+        tt: Dict[int, Tuple[int, float, int, Optional[MoveSeq]]] = {}
+
+        def ordered_moves(state: 'GameState', *first: Optional[MoveSeq]) -> List[MoveSeq]:
+            """Longest capture chains first, then the given moves moved to the front."""
+            moves = state._all_moves_for_turn()
+            moves.sort(key=len, reverse=True)
+            for move in reversed(first):
+                if move is not None and move in moves:
+                    moves.remove(move)
+                    moves.insert(0, move)
+            return moves
+
+        def minimax(state: 'GameState', depth_left: int, ply: int, alpha: float, beta: float) -> Tuple[float, Optional[MoveSeq]]:
             term = state.status()
             if depth_left == 0 or term != "In progress":
                 return evaluate(state.board), None
 
+            tt_move: Optional[MoveSeq] = None
+            entry = tt.get(state.hash)
+            if entry is not None:
+                tt_depth, tt_value, tt_flag, tt_move = entry
+                if tt_depth >= depth_left:
+                    if tt_flag == TT_EXACT:
+                        return tt_value, tt_move
+                    if tt_flag == TT_LOWER and tt_value >= beta:
+                        return tt_value, tt_move
+                    if tt_flag == TT_UPPER and tt_value <= alpha:
+                        return tt_value, tt_move
+
+            alpha_orig, beta_orig = alpha, beta
             best_move_local: Optional[MoveSeq] = None
+            moves = ordered_moves(state, tt_move, killers.get(ply))
 
             if state.turn == -1:  
-                max_eval = -float('inf')
-                for move in state._all_moves_for_turn():
-                    child = deepcopy(state)
-                    child.apply_move_sequence(move)
-                    eval_, _ = minimax(child, depth_left - 1, alpha, beta)
-                    if eval_ > max_eval:
-                        max_eval, best_move_local = eval_, move
+                best_eval = -float('inf')
+                for move in moves:
+                    record = state.apply_move_sequence_inplace(move)
+                    eval_, _ = minimax(state, depth_left - 1, ply + 1, alpha, beta)
+                    state.unapply_move_sequence(record)
+                    if eval_ > best_eval:
+                        best_eval, best_move_local = eval_, move
                     alpha = max(alpha, eval_)
                     if beta <= alpha:
+                        killers[ply] = move
                         break
-                return max_eval, best_move_local
             else:  
-                min_eval = float('inf')
-                for move in state._all_moves_for_turn():
-                    child = deepcopy(state)
-                    child.apply_move_sequence(move)
-                    eval_, _ = minimax(child, depth_left - 1, alpha, beta)
-                    if eval_ < min_eval:
-                        min_eval = eval_
+                best_eval = float('inf')
+                for move in moves:
+                    record = state.apply_move_sequence_inplace(move)
+                    eval_, _ = minimax(state, depth_left - 1, ply + 1, alpha, beta)
+                    state.unapply_move_sequence(record)
+                    if eval_ < best_eval:
+                        best_eval, best_move_local = eval_, move
                     beta = min(beta, eval_)
                     if beta <= alpha:
+                        killers[ply] = move
                         break
-                return min_eval, None
 
-        _, best = minimax(self, depth, -float('inf'), float('inf'))
-        if best is None:
-            return []  
+            if best_eval <= alpha_orig:
+                flag = TT_UPPER
+            elif best_eval >= beta_orig:
+                flag = TT_LOWER
+            else:
+                flag = TT_EXACT
+            if entry is None or depth_left >= entry[0]:
+                tt[state.hash] = (depth_left, best_eval, flag, best_move_local)
+            return best_eval, best_move_local
+
+        # The board may have been assigned directly (e.g. by the API), so
+        # resynchronise the incrementally maintained hash before searching.
+        self.rehash()
+        _, best = minimax(self, depth, 0, -float('inf'), float('inf'))
+        if best is None or self.turn != -1:
+            return ()  
         return best
 
     def _all_moves_for_turn(self) -> List[MoveSeq]:
-        moves: List[MoveSeq] = []
-        captures_exist = False
-        for r in range(self.BOARD_SIZE):
-            for c in range(self.BOARD_SIZE):
-                piece = self._piece_at(r, c)
-                if piece == Piece.EMPTY:
-                    continue
-                if (self.turn == 1 and piece.is_player) or (self.turn == -1 and piece.is_ai):
-                    cell_moves = self._capture_sequences_from(r, c, piece)
-                    if cell_moves:
-                        captures_exist = True
-                        moves.extend(cell_moves)
-        if captures_exist:
-            return moves 
-        for r in range(self.BOARD_SIZE):
-            for c in range(self.BOARD_SIZE):
-                piece = self._piece_at(r, c)
-                if piece == Piece.EMPTY:
-                    continue
-                if (self.turn == 1 and piece.is_player) or (self.turn == -1 and piece.is_ai):
-                    moves.extend(self._simple_moves_from(r, c, piece))
-        return moves
-
-
-
-app = FastAPI()
-
-game = GameState()
+        """Single pass over the dark squares; captures are mandatory when present."""
+        captures: List[MoveSeq] = []
+        simple: List[MoveSeq] = []
+        board = self.board
+        turn = self.turn
+        for sq in DARK_SQUARES:
+            piece = board[sq]
+            if piece * turn <= 0:
+                continue
+            cell_captures = self._capture_sequences_from(sq, piece)
+            if cell_captures:
+                captures.extend(cell_captures)
+            elif not captures:
+                simple.extend(self._simple_moves_from(sq, piece))
+        return captures if captures else simple
+
+
+def _build_move_tables() -> Tuple[Dict[Tuple[int, int], Tuple[int, ...]],
+                                  Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]]]:
+    """Precompute on-board step and jump targets for every (square, piece).
+
+    Simple targets are destination squares; jump targets are
+    ``(jumped square, landing square)`` pairs.
+    """
+    size = GameState.BOARD_SIZE
+    simple: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+    jumps: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {}
+    for piece in (Piece.PLAYER_MAN, Piece.PLAYER_KING, Piece.AI_MAN, Piece.AI_KING):
+        dirs = GameState._directions_for(piece)
+        for r in range(size):
+            for c in range(size):
+                simple[r * size + c, piece.value] = tuple(
+                    (r + dr) * size + c + dc
+                    for dr, dc in dirs if GameState._on_board(r + dr, c + dc)
+                )
+                jumps[r * size + c, piece.value] = tuple(
+                    ((r + dr) * size + c + dc, (r + 2 * dr) * size + c + 2 * dc)
+                    for dr, dc in dirs if GameState._on_board(r + 2 * dr, c + 2 * dc)
+                )
+    return simple, jumps
+
+
+SIMPLE_TARGETS, JUMP_TARGETS = _build_move_tables()
+
+
+# The search is pure Python and holds the GIL, so it runs in worker processes
+# to keep the event loop (and other clients) responsive during deep searches.
+# The pool belongs to the app's lifespan; workers are spawned rather than forked
+# from the threaded server process.
+AI_SEARCH_TIMEOUT = 30.0
+
+
+def _new_ai_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ai_pool = _new_ai_pool()
+    try:
+        yield
+    finally:
+        app.state.ai_pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
+
+# One GameState per client game, keyed by the ``game_id`` query parameter, so
+# clients no longer share (and overwrite) a single board. Only /init and
+# /reset create games; the registry keeps the MAX_GAMES most recently used
+# ones and never evicts the "default" game. GAMES_LOCK guards the registry
+# itself, not the games: concurrent requests on the same game_id still race.
+DEFAULT_GAME_ID = "default"
+MAX_GAMES = 1024
+GAMES: "OrderedDict[str, GameState]" = OrderedDict({DEFAULT_GAME_ID: GameState()})
+GAMES_LOCK = threading.Lock()
+
+
+def create_game(game_id: str) -> GameState:
+    """Return the game for ``game_id``, creating it (and evicting the LRU game) if needed."""
+    with GAMES_LOCK:
+        game = GAMES.get(game_id)
+        if game is None:
+            game = GAMES[game_id] = GameState()
+            while len(GAMES) > MAX_GAMES:
+                oldest = next(key for key in GAMES if key != DEFAULT_GAME_ID)
+                del GAMES[oldest]
+        GAMES.move_to_end(game_id)
+        return game
+
+
+def get_game(game_id: str) -> GameState:
+    """Return an existing game, or 404 if ``game_id`` was never initialised."""
+    with GAMES_LOCK:
+        game = GAMES.get(game_id)
+        if game is None:
+            raise HTTPException(status_code=404, detail=f"Unknown game_id {game_id!r}; call /init first")
+        GAMES.move_to_end(game_id)
+        return game
+
+
+@lru_cache(maxsize=4096)
+def _compute_ai_move(packed: bytes, depth: int) -> MoveSeq:
+    """Best AI move for a packed position; runs in the AI pool and memoises per worker."""
+    state = GameState._blank()
+    state.set_position(unpack_board(packed), -1)
+    return state.best_ai_move(depth)
+
+
+async def _search_ai_move(packed: bytes, depth: int) -> MoveSeq:
+    """Run _compute_ai_move in the AI pool, replacing the pool if a worker died."""
+    pool = app.state.ai_pool
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(
+            loop.run_in_executor(pool, _compute_ai_move, packed, depth), AI_SEARCH_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        # The worker cannot be interrupted; it finishes in the background.
+        raise HTTPException(status_code=504, detail="AI search timed out")
+    except BrokenProcessPool:
+        if app.state.ai_pool is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            app.state.ai_pool = _new_ai_pool()
+        raise HTTPException(status_code=503, detail="AI worker crashed, please retry")
+
+
+# Opening book: (Zobrist hash of an AI-to-move position, search depth) ->
+# best move, generated offline by build_book.py. Keying by depth keeps the
+# ``depth`` query parameter meaningful: a book hit returns exactly what a live
+# search at that depth would. Missing or mismatched book means live search only.
+BOOK_PATH = Path(__file__).with_name("book.json")
+BOOK_FORMAT = 1
+
+logger = logging.getLogger(__name__)
+
+
+def load_book(path: Path) -> Dict[Tuple[int, int], MoveSeq]:
+    """Load a book written by build_book.py; returns {} if absent or invalid.
+
+    File layout: ``{"format": 1, "moves": {"<depth>": {"<hash>": [sq, ...]}}}``.
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring opening book %s: %s", path, exc)
+        return {}
+    if not isinstance(data, dict) or data.get("format") != BOOK_FORMAT:
+        logger.warning("Ignoring opening book %s: expected format %d", path, BOOK_FORMAT)
+        return {}
+    book: Dict[Tuple[int, int], MoveSeq] = {}
+    try:
+        for depth, moves in data["moves"].items():
+            for h, move in moves.items():
+                if not all(isinstance(sq, int) and 0 <= sq < 64 for sq in move):
+                    raise ValueError(f"bad move {move!r}")
+                book[int(h), int(depth)] = tuple(move)
+    except (AttributeError, KeyError, TypeError, ValueError) as exc:
+        logger.warning("Ignoring opening book %s: %s", path, exc)
+        return {}
+    return book
+
+
+BOOK = load_book(BOOK_PATH)
 
 
 class BoardOnly(BaseModel):
+    board: BoardRows
+
+
+# Response models: endpoints return these, and with the declared return type
+# FastAPI serialises straight to JSON bytes through pydantic-core instead of
+# jsonable_encoder + json.dumps.
+class BoardState(BaseModel):
+    board: List[List[int]]
+    turn: int
+
+
+class PlayerMoveResult(BaseModel):
+    board: List[List[int]]
+    player_move: ApiMoveSeq
+    turn: int
+
+
+class AIMoveResult(BaseModel):
     board: List[List[int]]
+    ai_move: ApiMoveSeq
+    turn: int
+
+
+class ResetResult(BaseModel):
+    message: str
+    board: List[List[int]]
+    turn: int
+
+
+class ValidMoves(BaseModel):
+    valid_moves: List[ApiMoveSeq]
+
+
+class GameStatus(BaseModel):
+    status: str
 
 
 @app.get("/init")
-def init_game():
+def init_game(game_id: str = Query(DEFAULT_GAME_ID)) -> BoardState:
+    game = create_game(game_id)
     game.reset()
-    return {"board": game.board, "turn": game.turn}
+    return BoardState(board=board_to_rows(game.board), turn=game.turn)
 
 
 @app.post("/move")
-def make_move(data: Move):
-    game.board = data.board
-    game.apply_move_sequence(data.move)
-    return {
-        "board": game.board,
-        "player_move": data.move,
-        "turn": game.turn,
-    }
+def make_move(data: Move, game_id: str = Query(DEFAULT_GAME_ID)) -> PlayerMoveResult:
+    game = get_game(game_id)
+    game.set_position(board_from_rows(data.board), game.turn)
+    game.apply_move_sequence(move_to_squares(data.move))
+    return PlayerMoveResult(
+        board=board_to_rows(game.board),
+        player_move=data.move,
+        turn=game.turn,
+    )
 
 
 @app.post("/ai-move")
-def ai_move(data: BoardOnly, depth: int = Query(4, ge=1, le=8)):
+async def ai_move(data: BoardOnly, depth: int = Query(4, ge=1, le=8), game_id: str = Query(DEFAULT_GAME_ID)) -> AIMoveResult:
     """Compute and apply the best AI move, returning the updated board and move sequence."""
-    game.board = data.board
-    game.turn = -1  
-    best_seq = game.best_ai_move(depth)
+    game = get_game(game_id)
+    board = board_from_rows(data.board)
+    best_seq = BOOK.get((zobrist_hash(board, -1), depth))
+    if best_seq is None:
+        best_seq = await _search_ai_move(pack_board(board), depth)
+    game.set_position(board, -1)
     if best_seq:
         game.apply_move_sequence(best_seq)
-    return {
-        "board": game.board,
-        "ai_move": best_seq,
-        "turn": game.turn,
-    }
+    return AIMoveResult(
+        board=board_to_rows(game.board),
+        ai_move=move_from_squares(best_seq),
+        turn=game.turn,
+    )
 
 
 @app.post("/reset")
-def reset_game():
+def reset_game(game_id: str = Query(DEFAULT_GAME_ID)) -> ResetResult:
+    game = create_game(game_id)
     game.reset()
-    return {"message": "Game reset", "board": game.board, "turn": game.turn}
+    return ResetResult(message="Game reset", board=board_to_rows(game.board), turn=game.turn)
 
 
 @app.get("/valid-moves")
-def get_valid_moves(row: int = Query(...), col: int = Query(...)):
-    return {"valid_moves": game.get_valid_moves(row, col)}
+def get_valid_moves(row: int = Query(..., ge=0, lt=8), col: int = Query(..., ge=0, lt=8), game_id: str = Query(DEFAULT_GAME_ID)) -> ValidMoves:
+    game = get_game(game_id)
+    return ValidMoves(valid_moves=[move_from_squares(move) for move in game.get_valid_moves(row, col)])
 
 
 @app.get("/status")
-def get_status():
-    return {"status": game.status()}
+def get_status(game_id: str = Query(DEFAULT_GAME_ID)) -> GameStatus:
+    game = get_game(game_id)
+    return GameStatus(status=game.status())
 
 
 @app.post("/undo")
-def undo_move():
+def undo_move(game_id: str = Query(DEFAULT_GAME_ID)) -> BoardState:
+    game = get_game(game_id)
     game.undo()
-    return {"board": game.board, "turn": game.turn}
+    return BoardState(board=board_to_rows(game.board), turn=game.turn)